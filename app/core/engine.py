@@ -1,10 +1,16 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Dict, List, Any, Tuple
-import pandas as pd
+from typing import TYPE_CHECKING, Dict, List, Any, Tuple
 from datetime import date
 
+if TYPE_CHECKING:  # pandas is imported lazily to keep app startup cheap
+    import pandas as pd
+
+
+# Holding period (days) at or beyond which a lot is long-term
+LT_THRESHOLD_DAYS = 365
+
 
 @dataclass
 class BuyLot:
@@ -12,6 +18,7 @@ class BuyLot:
     qty_remaining: float
     unit_cost: float  # includes buy-side costs per unit
     source_buy_row_id: int
+    isin: str = ""
 
 
 def _prepare_rows(df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
@@ -19,6 +26,7 @@ def _prepare_rows(df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
     sells = df[df["action"] == "SELL"].copy()
     # embed buy costs into unit cost
     buys["unit_cost"] = (buys["price"] * buys["quantity"] + buys["brokerage"].fillna(0) + buys["charges"].fillna(0)) / buys["quantity"]
+    buys["isin"] = buys["isin"].fillna("").astype(str).str.strip()
     # sell costs total for each sell row
     sells["sell_gross"] = sells["price"] * sells["quantity"]
     sells["sell_costs_total"] = sells["brokerage"].fillna(0) + sells["charges"].fillna(0) + sells["stt"].fillna(0)
@@ -39,6 +47,7 @@ def _fifo_match_for_scrip(buys: pd.DataFrame, sells: pd.DataFrame, scrip: str) -
                 qty_remaining=float(r["quantity"]),
                 unit_cost=float(r["unit_cost"]),
                 source_buy_row_id=int(r["source_row_id"]),
+                isin=r["isin"],
             )
         )
 
@@ -65,7 +74,7 @@ def _fifo_match_for_scrip(buys: pd.DataFrame, sells: pd.DataFrame, scrip: str) -
             buy_cost_total = take_qty * lot.unit_cost
             gain = proceeds_net - buy_cost_total
             holding_days = (sell_date - lot.buy_date).days
-            term = "ST" if holding_days < 365 else "LT"
+            term = "ST" if holding_days < LT_THRESHOLD_DAYS else "LT"
 
             realized.append(
                 {
@@ -96,6 +105,8 @@ def _fifo_match_for_scrip(buys: pd.DataFrame, sells: pd.DataFrame, scrip: str) -
 
 
 def process_transactions(canon_df: pd.DataFrame) -> Dict[str, Any]:
+    import pandas as pd
+
     buys, sells = _prepare_rows(canon_df)
 
     scrips = sorted(canon_df["scrip"].unique())
@@ -186,6 +197,7 @@ def process_transactions(canon_df: pd.DataFrame) -> Dict[str, Any]:
         open_rows.append(
             {
                 "Scrip": s,
+                "ISIN": l.isin,
                 "BuyDate": l.buy_date,
                 "QtyRemaining": l.qty_remaining,
                 "UnitCost": l.unit_cost,
@@ -195,7 +207,7 @@ def process_transactions(canon_df: pd.DataFrame) -> Dict[str, Any]:
         )
     open_df = pd.DataFrame(open_rows)
     if open_df.empty:
-        open_df = pd.DataFrame(columns=["Scrip", "BuyDate", "QtyRemaining", "UnitCost", "TotalCost", "AgeDays"])
+        open_df = pd.DataFrame(columns=["Scrip", "ISIN", "BuyDate", "QtyRemaining", "UnitCost", "TotalCost", "AgeDays"])
 
     return {
         "realized_lots": realized_df,
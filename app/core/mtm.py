@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict
+from datetime import date
+
+from .engine import LT_THRESHOLD_DAYS
+
+if TYPE_CHECKING:  # pandas/numpy are imported lazily to keep app startup cheap
+    import numpy as np
+    import pandas as pd
+
+
+@dataclass
+class LotMatrix:
+    """Open lots as column arrays, built once per token and reused across price refreshes."""
+
+    base: pd.DataFrame  # Scrip, ISIN, BuyDate, QtyRemaining, UnitCost, TotalCost
+    scrip_keys: np.ndarray  # upper-cased scrip, for the price join
+    isin_keys: np.ndarray  # upper-cased ISIN ("" when unknown)
+    buy_day: np.ndarray  # BuyDate as days since epoch (int64)
+    qty: np.ndarray
+    total_cost: np.ndarray
+
+
+def build_lot_matrix(open_df: pd.DataFrame) -> LotMatrix:
+    import numpy as np
+    import pandas as pd
+
+    base = open_df[["Scrip", "ISIN", "BuyDate", "QtyRemaining", "UnitCost", "TotalCost"]].reset_index(drop=True)
+    return LotMatrix(
+        base=base,
+        scrip_keys=base["Scrip"].astype(str).str.strip().str.upper().to_numpy(dtype=object),
+        isin_keys=base["ISIN"].fillna("").astype(str).str.strip().str.upper().to_numpy(dtype=object),
+        buy_day=pd.to_datetime(base["BuyDate"]).to_numpy().astype("datetime64[D]").astype(np.int64),
+        qty=base["QtyRemaining"].to_numpy(dtype=float),
+        total_cost=base["TotalCost"].to_numpy(dtype=float),
+    )
+
+
+def _lookup(keys: np.ndarray, price_keys: pd.Series, prices: pd.Series) -> np.ndarray:
+    """Vectorized key -> price lookup; NaN where the key is absent or blank."""
+    import numpy as np
+    import pandas as pd
+
+    mask = price_keys.ne("")
+    # Last row wins for duplicate keys in the snapshot
+    table = pd.Series(prices[mask].to_numpy(), index=price_keys[mask].to_numpy())
+    table = table[~table.index.duplicated(keep="last")]
+    idx = pd.Index(table.index).get_indexer(keys)
+    values = np.append(table.to_numpy(dtype=float), np.nan)  # idx -1 -> trailing NaN
+    return values[idx]
+
+
+def mark_to_market(matrix: LotMatrix, prices_df: pd.DataFrame, asof: date) -> Dict[str, Any]:
+    """Unrealized gain, term as of `asof` and days until LTCG for every open lot.
+
+    Prices are matched by ISIN first and fall back to scrip. Lots without a
+    price keep NaN market values and are excluded from the summary totals.
+    Lots bought after `asof` were not held on that date and are dropped.
+    """
+    import numpy as np
+    import pandas as pd
+
+    price = _lookup(matrix.isin_keys, prices_df["isin"], prices_df["price"])
+    by_scrip = _lookup(matrix.scrip_keys, prices_df["scrip"], prices_df["price"])
+    price = np.where(np.isnan(price), by_scrip, price)
+
+    asof_day = np.datetime64(asof, "D").astype(np.int64)
+    holding_days = asof_day - matrix.buy_day
+    held = holding_days >= 0
+    not_held_scrips = sorted(set(matrix.base.loc[~held, "Scrip"].astype(str)))
+
+    price = price[held]
+    holding_days = holding_days[held]
+    total_cost = matrix.total_cost[held]
+    is_lt = holding_days >= LT_THRESHOLD_DAYS
+    market_value = matrix.qty[held] * price
+    gain = market_value - total_cost
+
+    lots = matrix.base[held].reset_index(drop=True)
+    lots["Price"] = price
+    lots["MarketValue"] = market_value
+    lots["UnrealizedGain"] = gain
+    lots["HoldingDays"] = holding_days
+    lots["Term"] = np.where(is_lt, "LT", "ST")
+    lots["DaysUntilLT"] = np.maximum(LT_THRESHOLD_DAYS - holding_days, 0)
+
+    priced = ~np.isnan(price)
+    summary = pd.DataFrame(
+        [
+            {
+                "STCG_Unrealized": float(gain[priced & ~is_lt].sum()),
+                "LTCG_Unrealized": float(gain[priced & is_lt].sum()),
+                "Net_Unrealized_Gain": float(gain[priced].sum()),
+                "Total_Market_Value": float(market_value[priced].sum()),
+                "Total_Cost": float(total_cost[priced].sum()),
+                "#Lots": int(len(lots)),
+                "#UnpricedLots": int((~priced).sum()),
+            }
+        ]
+    )
+
+    return {
+        "unrealized_lots": lots,
+        "unrealized_summary": summary,
+        "unpriced_scrips": sorted(set(lots.loc[~priced, "Scrip"].astype(str))),
+        "not_held_lots": int((~held).sum()),
+        "not_held_scrips": not_held_scrips,
+    }
@@ -1,15 +1,19 @@
-from fastapi import FastAPI, UploadFile, File, Request, HTTPException
-from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse
+from fastapi import FastAPI, UploadFile, File, Form, Request, HTTPException
+from fastapi.responses import HTMLResponse, JSONResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-from typing import Dict, Any
+from functools import lru_cache
+from typing import Dict, Any, Optional, Tuple
+from datetime import date
+import hashlib
 import io
+import json
 import uuid
 import time
-from openpyxl import Workbook
 
-from .parsing.reader import read_transactions
+from .parsing.reader import read_price_snapshot, read_transactions
 from .core.engine import process_transactions
+from .core.mtm import build_lot_matrix, mark_to_market
 from .reports.export import (
     dataframes_to_csv_bytes,
     dataframes_to_excel_bytes,
@@ -26,6 +30,8 @@ app.mount("/static", StaticFiles(directory="app/ui/static"), name="static")
 RESULTS: Dict[str, Dict[str, Any]] = {}
 RESULT_TTL_SECONDS = 60 * 30
 
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
 
 def _cleanup_results() -> None:
     now = time.time()
@@ -82,6 +88,50 @@ def _get_result_token(token: str) -> Dict[str, Any]:
     return data
 
 
+@app.post("/api/mtm/{token}")
+async def mtm(token: str, file: UploadFile = File(...), asof: Optional[str] = Form(None)):
+    res = _get_result_token(token)
+    try:
+        try:
+            asof_date = date.fromisoformat(asof) if asof else date.today()
+        except ValueError:
+            return JSONResponse({"ok": False, "validations": {"errors": [f"Invalid asof date: {asof}"], "warnings": []}}, status_code=400)
+
+        content = await file.read()
+        prices, validations = read_price_snapshot(io.BytesIO(content))
+        if validations["errors"]:
+            return JSONResponse({"ok": False, "validations": validations}, status_code=400)
+
+        # Lot matrix is cached per token so repeated price refreshes skip the rebuild
+        matrix = res.get("lot_matrix")
+        if matrix is None:
+            matrix = res["lot_matrix"] = build_lot_matrix(res["open_positions"])
+        out = mark_to_market(matrix, prices, asof_date)
+        if out["unpriced_scrips"]:
+            validations["warnings"].append("No price for: " + ", ".join(out["unpriced_scrips"]))
+        if out["not_held_lots"]:
+            validations["warnings"].append(
+                f"Excluded {out['not_held_lots']} lot(s) bought after {asof_date.isoformat()}: "
+                + ", ".join(out["not_held_scrips"])
+            )
+        return {
+            "ok": True,
+            "asof": asof_date.isoformat(),
+            "validations": validations,
+            "unrealized_lots": _records(out["unrealized_lots"]),
+            "unrealized_summary": _records(out["unrealized_summary"]),
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        return JSONResponse({"ok": False, "error": str(e)}, status_code=500)
+
+
+def _records(df) -> list:
+    # NaN is not valid JSON; emit null instead
+    return df.astype(object).where(df.notna(), None).to_dict(orient="records")
+
+
 @app.get("/download/{token}/csv")
 def download_csv(token: str):
     res = _get_result_token(token)
@@ -95,7 +145,7 @@ def download_excel(token: str):
     res = _get_result_token(token)
     bio = io.BytesIO(dataframes_to_excel_bytes(res))
     headers = {"Content-Disposition": f"attachment; filename=reports_{token}.xlsx"}
-    return StreamingResponse(bio, media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", headers=headers)
+    return StreamingResponse(bio, media_type=XLSX_MEDIA_TYPE, headers=headers)
 
 
 @app.get("/healthz")
@@ -103,31 +153,48 @@ def healthz():
     return {"ok": True}
 
 
-@app.get("/sample/template.xlsx")
-def sample_template():
+SAMPLE_TEMPLATE_ROWS = [
+    ["TradeDate", "Scrip", "Action", "Quantity", "Price", "Brokerage", "Charges", "STT", "Exchange", "ISIN", "Notes"],
+    # Sample rows
+    ["2023-01-01", "TCS", "BUY", 100, 3000, 10, 5, 0, "NSE", "INE467B01029", "Initial buy"],
+    ["2023-03-01", "TCS", "BUY", 50, 3200, 10, 5, 0, "NSE", "INE467B01029", "Additional buy"],
+    ["2023-06-15", "TCS", "SELL", 80, 3300, 12, 6, 3, "NSE", "INE467B01029", "Partial sell"],
+    ["2024-01-10", "TCS", "SELL", 30, 3400, 12, 6, 3, "NSE", "INE467B01029", "Another sell"],
+]
+
+
+@lru_cache(maxsize=1)
+def _sample_template() -> Tuple[bytes, str]:
+    """Build the sample workbook once and return its bytes with an ETag."""
+    from openpyxl import Workbook
+
     wb = Workbook()
     ws = wb.active
     ws.title = "Transactions"
-    ws.append([
-        "TradeDate",
-        "Scrip",
-        "Action",
-        "Quantity",
-        "Price",
-        "Brokerage",
-        "Charges",
-        "STT",
-        "Exchange",
-        "ISIN",
-        "Notes",
-    ])
-    # Sample rows
-    ws.append(["2023-01-01", "TCS", "BUY", 100, 3000, 10, 5, 0, "NSE", "INE467B01029", "Initial buy"])
-    ws.append(["2023-03-01", "TCS", "BUY", 50, 3200, 10, 5, 0, "NSE", "INE467B01029", "Additional buy"])
-    ws.append(["2023-06-15", "TCS", "SELL", 80, 3300, 12, 6, 3, "NSE", "INE467B01029", "Partial sell"])
-    ws.append(["2024-01-10", "TCS", "SELL", 30, 3400, 12, 6, 3, "NSE", "INE467B01029", "Another sell"])
+    for row in SAMPLE_TEMPLATE_ROWS:
+        ws.append(row)
     bio = io.BytesIO()
     wb.save(bio)
-    bio.seek(0)
-    headers = {"Content-Disposition": "attachment; filename=sample_template.xlsx"}
-    return StreamingResponse(bio, media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", headers=headers)
+    # openpyxl stamps save time into the file, so the bytes differ per process.
+    # Hash the row data instead and mark the tag weak so every replica agrees.
+    digest = hashlib.sha256(json.dumps(SAMPLE_TEMPLATE_ROWS).encode()).hexdigest()[:32]
+    return bio.getvalue(), f'W/"{digest}"'
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [c.strip() for c in if_none_match.split(",")]
+    # Weak comparison per RFC 9110 for If-None-Match
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    return "*" in candidates or opaque in [c[2:] if c.startswith("W/") else c for c in candidates]
+
+
+@app.get("/sample/template.xlsx")
+def sample_template(request: Request):
+    data, etag = _sample_template()
+    headers = {"ETag": etag, "Cache-Control": "public, max-age=86400"}
+    if _etag_matches(request.headers.get("if-none-match", ""), etag):
+        return Response(status_code=304, headers=headers)
+    headers["Content-Disposition"] = "attachment; filename=sample_template.xlsx"
+    return Response(content=data, media_type=XLSX_MEDIA_TYPE, headers=headers)
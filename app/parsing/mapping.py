@@ -34,3 +34,12 @@ COLUMN_MAPPING: Dict[str, List[str]] = {
     "notes": ["notes", "remark", "remarks"],
 }
 
+
+# Price snapshot (CSV) fields: price plus at least one of scrip/isin
+PRICE_KEY_FIELDS: List[str] = ["scrip", "isin"]
+
+PRICE_COLUMN_MAPPING: Dict[str, List[str]] = {
+    "scrip": ["scrip", "symbol", "stock", "name"],
+    "isin": ["isin"],
+    "price": ["price", "ltp", "close", "last_price", "rate"],
+}
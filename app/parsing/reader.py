@@ -1,11 +1,18 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Any, Dict, List, Tuple
-import pandas as pd
-import numpy as np
+from typing import TYPE_CHECKING, Any, Dict, List, Tuple
 
-from .mapping import COLUMN_MAPPING, REQUIRED_FIELDS, OPTIONAL_FIELDS
+from .mapping import (
+    COLUMN_MAPPING,
+    REQUIRED_FIELDS,
+    OPTIONAL_FIELDS,
+    PRICE_COLUMN_MAPPING,
+    PRICE_KEY_FIELDS,
+)
+
+if TYPE_CHECKING:  # pandas is imported lazily to keep app startup cheap
+    import pandas as pd
 
 
 @dataclass
@@ -14,10 +21,10 @@ class ValidationReport:
     warnings: List[str]
 
 
-def _resolve_columns(df: pd.DataFrame) -> Dict[str, str]:
-    lower_cols = {c.lower().strip(): c for c in df.columns}
+def _resolve_columns(df: pd.DataFrame, mapping: Dict[str, List[str]] = COLUMN_MAPPING) -> Dict[str, str]:
+    lower_cols = {str(c).lower().strip(): c for c in df.columns}
     resolved: Dict[str, str] = {}
-    for canon, options in COLUMN_MAPPING.items():
+    for canon, options in mapping.items():
         for opt in options:
             if opt in lower_cols:
                 resolved[canon] = lower_cols[opt]
@@ -26,6 +33,8 @@ def _resolve_columns(df: pd.DataFrame) -> Dict[str, str]:
 
 
 def _coerce_types(df: pd.DataFrame, colmap: Dict[str, str], validations: ValidationReport) -> pd.DataFrame:
+    import pandas as pd
+
     # Dates
     if "trade_date" in colmap:
         df[colmap["trade_date"]] = pd.to_datetime(df[colmap["trade_date"]], errors="coerce").dt.date
@@ -37,6 +46,9 @@ def _coerce_types(df: pd.DataFrame, colmap: Dict[str, str], validations: Validat
 
 
 def _canonicalize(df: pd.DataFrame, colmap: Dict[str, str]) -> pd.DataFrame:
+    import numpy as np
+    import pandas as pd
+
     out = pd.DataFrame()
     # Required
     out["trade_date"] = df[colmap["trade_date"]]
@@ -58,6 +70,8 @@ def _canonicalize(df: pd.DataFrame, colmap: Dict[str, str]) -> pd.DataFrame:
 
 def read_transactions(fobj: Any) -> Tuple[pd.DataFrame, Dict[str, List[str]]]:
     """Read Excel and return canonical DataFrame + validation report dict."""
+    import pandas as pd
+
     validations = ValidationReport(errors=[], warnings=[])
 
     xls = pd.ExcelFile(fobj)
@@ -103,3 +117,40 @@ def read_transactions(fobj: Any) -> Tuple[pd.DataFrame, Dict[str, List[str]]]:
 
     return canon, validations.__dict__
 
+
+def read_price_snapshot(fobj: Any) -> Tuple[pd.DataFrame, Dict[str, List[str]]]:
+    """Read a price snapshot CSV and return canonical (scrip, isin, price) DataFrame + validation report dict."""
+    import pandas as pd
+
+    validations = ValidationReport(errors=[], warnings=[])
+
+    try:
+        df = pd.read_csv(fobj, dtype=str)
+    except (pd.errors.EmptyDataError, pd.errors.ParserError, UnicodeDecodeError) as e:
+        validations.errors.append(f"Could not read price snapshot CSV: {e}")
+        return pd.DataFrame(), validations.__dict__
+    if df.empty:
+        validations.errors.append("Price snapshot is empty")
+        return df, validations.__dict__
+
+    colmap = _resolve_columns(df, PRICE_COLUMN_MAPPING)
+    if "price" not in colmap:
+        validations.errors.append("Missing required column: price")
+    if not any(k in colmap for k in PRICE_KEY_FIELDS):
+        validations.errors.append("Missing key column: scrip or isin")
+    if validations.errors:
+        return df, validations.__dict__
+
+    out = pd.DataFrame()
+    for key in PRICE_KEY_FIELDS:
+        out[key] = df[colmap[key]].fillna("").astype(str).str.strip().str.upper() if key in colmap else ""
+    out["price"] = pd.to_numeric(df[colmap["price"]], errors="coerce")
+
+    bad = out["price"].isna() | out["price"].lt(0)
+    if bad.any():
+        validations.warnings.append(f"Ignoring {int(bad.sum())} price rows with missing or negative prices")
+        out = out[~bad].reset_index(drop=True)
+    if out.empty:
+        validations.errors.append("Price snapshot has no valid prices")
+
+    return out, validations.__dict__
@@ -2,10 +2,10 @@ from __future__ import annotations
 
 import io
 import zipfile
-from typing import Dict, Any
-import pandas as pd
-from openpyxl.chart import BarChart, PieChart, Reference
-from openpyxl.chart.label import DataLabelList
+from typing import TYPE_CHECKING, Dict, Any
+
+if TYPE_CHECKING:  # pandas/openpyxl are imported lazily to keep app startup cheap
+    import pandas as pd
 
 
 def dataframes_to_csv_bytes(results: Dict[str, Any]) -> bytes:
@@ -22,6 +22,8 @@ def dataframes_to_csv_bytes(results: Dict[str, Any]) -> bytes:
 
 
 def dataframes_to_excel_bytes(results: Dict[str, Any]) -> bytes:
+    import pandas as pd
+
     buf = io.BytesIO()
     with pd.ExcelWriter(buf, engine="openpyxl") as writer:
         # Write all sheets
@@ -44,6 +46,8 @@ def dataframes_to_excel_bytes(results: Dict[str, Any]) -> bytes:
 
 def _add_per_scrip_charts(workbook, per_scrip_df: pd.DataFrame):
     """Add STCG/LTCG bar chart to PerScripSummary sheet"""
+    from openpyxl.chart import BarChart, Reference
+
     if per_scrip_df.empty:
         return
 
@@ -93,6 +97,9 @@ def _add_per_scrip_charts(workbook, per_scrip_df: pd.DataFrame):
 
 def _add_overall_charts(workbook, overall_df: pd.DataFrame):
     """Add pie chart for overall STCG/LTCG distribution"""
+    from openpyxl.chart import PieChart, Reference
+    from openpyxl.chart.label import DataLabelList
+
     if overall_df.empty:
         return
 
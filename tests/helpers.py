@@ -0,0 +1,18 @@
+"""Shared row builders for tests."""
+
+
+def base_row(td, scrip, action, qty, price, b=0, c=0, stt=0, rid=0):
+    return {
+        'trade_date': td,
+        'scrip': scrip,
+        'action': action,
+        'quantity': qty,
+        'price': price,
+        'brokerage': b,
+        'charges': c,
+        'stt': stt,
+        'exchange': '',
+        'isin': '',
+        'notes': '',
+        'source_row_id': rid,
+    }
@@ -2,29 +2,13 @@ import pandas as pd
 from datetime import date, timedelta
 
 from app.core.engine import process_transactions
+from tests.helpers import base_row
 
 
 def df_from(rows):
     return pd.DataFrame(rows)
 
 
-def base_row(td, scrip, action, qty, price, b=0, c=0, stt=0, rid=0):
-    return {
-        'trade_date': td,
-        'scrip': scrip,
-        'action': action,
-        'quantity': qty,
-        'price': price,
-        'brokerage': b,
-        'charges': c,
-        'stt': stt,
-        'exchange': '',
-        'isin': '',
-        'notes': '',
-        'source_row_id': rid,
-    }
-
-
 def test_partial_sells_multiple_buys():
     # Two buys, one sell that spans both
     rows = [
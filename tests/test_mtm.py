@@ -0,0 +1,169 @@
+import asyncio
+import io
+import json
+import math
+import time
+import uuid
+from datetime import date, timedelta
+
+import pandas as pd
+import pytest
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+
+from app.core.engine import process_transactions
+from app.core.mtm import build_lot_matrix, mark_to_market
+from app.parsing.reader import read_price_snapshot
+from tests.helpers import base_row
+
+
+def open_lots(rows):
+    return process_transactions(pd.DataFrame(rows))["open_positions"]
+
+
+def prices_from(csv_text):
+    df, validations = read_price_snapshot(io.BytesIO(csv_text.encode()))
+    assert validations["errors"] == []
+    return df
+
+
+def test_unrealized_gain_and_term_flip():
+    buy_date = date(2023, 1, 1)
+    rows = [
+        base_row(buy_date, 'TCS', 'BUY', 10, 100, b=10, rid=1),
+        base_row(date(2023, 6, 1), 'TCS', 'BUY', 5, 120, rid=2),
+        base_row(date(2023, 7, 1), 'TCS', 'SELL', 4, 130, rid=3),
+    ]
+    matrix = build_lot_matrix(open_lots(rows))
+    prices = prices_from("Symbol,LTP\ntcs,150\n")
+
+    asof = buy_date + timedelta(days=364)
+    lots = mark_to_market(matrix, prices, asof)["unrealized_lots"]
+    assert list(lots["QtyRemaining"]) == [6, 5]
+    # First lot unit cost = (10*100+10)/10 = 101
+    assert round(lots.iloc[0]["UnrealizedGain"], 4) == round(6 * (150 - 101), 4)
+    assert lots.iloc[0]["Term"] == 'ST'
+    assert lots.iloc[0]["DaysUntilLT"] == 1
+
+    # Same cached matrix, one day later: first lot flips to LT
+    out = mark_to_market(matrix, prices, asof + timedelta(days=1))
+    lots = out["unrealized_lots"]
+    assert lots.iloc[0]["Term"] == 'LT'
+    assert lots.iloc[0]["DaysUntilLT"] == 0
+    assert lots.iloc[1]["Term"] == 'ST'
+    summary = out["unrealized_summary"].iloc[0]
+    assert round(summary["LTCG_Unrealized"], 4) == round(lots.iloc[0]["UnrealizedGain"], 4)
+    assert round(summary["STCG_Unrealized"], 4) == round(lots.iloc[1]["UnrealizedGain"], 4)
+
+
+def test_isin_match_preferred_and_unpriced_lots():
+    rows = [
+        base_row(date(2023, 1, 1), 'TCS', 'BUY', 1, 100, rid=1),
+        base_row(date(2023, 1, 1), 'INFY', 'BUY', 1, 100, rid=2),
+    ]
+    rows[0]['isin'] = 'INE467B01029'
+    matrix = build_lot_matrix(open_lots(rows))
+    prices = prices_from("Scrip,ISIN,Price\nTCS-OLD,ine467b01029,300\nTCS,,200\n")
+
+    out = mark_to_market(matrix, prices, date(2024, 1, 1))
+    lots = out["unrealized_lots"].set_index("Scrip")
+    assert lots.loc['TCS', 'Price'] == 300
+    assert math.isnan(lots.loc['INFY', 'Price'])
+    assert out["unpriced_scrips"] == ['INFY']
+    assert out["unrealized_summary"].iloc[0]["#UnpricedLots"] == 1
+
+
+def test_price_snapshot_requires_price_and_key():
+    _, validations = read_price_snapshot(io.BytesIO(b"Scrip,Qty\nTCS,1\n"))
+    assert "Missing required column: price" in validations["errors"]
+    _, validations = read_price_snapshot(io.BytesIO(b"Price\n100\n"))
+    assert "Missing key column: scrip or isin" in validations["errors"]
+
+
+def test_lots_bought_after_asof_are_excluded():
+    rows = [
+        base_row(date(2021, 1, 1), 'TCS', 'BUY', 1, 100, rid=1),
+        base_row(date(2023, 3, 1), 'INFY', 'BUY', 1, 100, rid=2),
+    ]
+    matrix = build_lot_matrix(open_lots(rows))
+    prices = prices_from("Scrip,Price\nTCS,150\nINFY,300\n")
+
+    out = mark_to_market(matrix, prices, date(2022, 1, 15))
+    lots = out["unrealized_lots"]
+    assert list(lots["Scrip"]) == ['TCS']
+    assert (lots["HoldingDays"] >= 0).all()
+    assert out["not_held_lots"] == 1
+    assert out["not_held_scrips"] == ['INFY']
+    summary = out["unrealized_summary"].iloc[0]
+    assert summary["STCG_Unrealized"] == 0
+    assert summary["LTCG_Unrealized"] == 50
+    assert summary["#Lots"] == 1
+
+
+# Handler-level tests for POST /api/mtm/{token}
+def _call_mtm(token, csv_bytes, asof=None):
+    from starlette.datastructures import UploadFile
+    from app.main import mtm
+
+    return asyncio.run(mtm(token, UploadFile(io.BytesIO(csv_bytes)), asof))
+
+
+def _store_token(rows):
+    from app import main
+
+    token = str(uuid.uuid4())
+    main.RESULTS[token] = {"ts": time.time(), **process_transactions(pd.DataFrame(rows))}
+    return token
+
+
+def test_mtm_endpoint_reuses_cached_lot_matrix(monkeypatch):
+    from app import main
+
+    calls = []
+    real_build = main.build_lot_matrix
+
+    def counting_build(open_df):
+        calls.append(1)
+        return real_build(open_df)
+
+    monkeypatch.setattr(main, "build_lot_matrix", counting_build)
+    token = _store_token([base_row(date(2023, 1, 1), 'TCS', 'BUY', 10, 100, rid=1)])
+
+    first = _call_mtm(token, b"Scrip,Price\nTCS,150\n", "2024-01-01")
+    matrix = main.RESULTS[token]["lot_matrix"]
+    second = _call_mtm(token, b"Scrip,Price\nTCS,90\n", "2024-01-01")
+
+    assert len(calls) == 1
+    assert main.RESULTS[token]["lot_matrix"] is matrix
+    assert first["unrealized_lots"][0]["UnrealizedGain"] == 500
+    assert second["unrealized_lots"][0]["UnrealizedGain"] == -100
+
+
+def test_mtm_endpoint_unpriced_and_not_held_warnings():
+    token = _store_token([
+        base_row(date(2023, 1, 1), 'TCS', 'BUY', 10, 100, rid=1),
+        base_row(date(2024, 6, 1), 'INFY', 'BUY', 10, 100, rid=2),
+    ])
+    res = _call_mtm(token, b"Scrip,Price\nWIPRO,1\n", "2024-01-01")
+    assert res["ok"] is True
+    lot = res["unrealized_lots"][0]
+    # NaN must become null so the response is valid JSON
+    assert lot["Price"] is None and lot["UnrealizedGain"] is None
+    json.dumps(jsonable_encoder(res), allow_nan=False)
+    assert "No price for: TCS" in res["validations"]["warnings"]
+    assert any("bought after 2024-01-01: INFY" in w for w in res["validations"]["warnings"])
+
+
+def test_mtm_endpoint_errors():
+    with pytest.raises(HTTPException) as exc:
+        _call_mtm("no-such-token", b"Scrip,Price\nTCS,1\n")
+    assert exc.value.status_code == 404
+
+    token = _store_token([base_row(date(2023, 1, 1), 'TCS', 'BUY', 1, 100, rid=1)])
+    resp = _call_mtm(token, b"Scrip,Price\nTCS,1\n", "not-a-date")
+    assert resp.status_code == 400
+    assert "Invalid asof date" in json.loads(resp.body)["validations"]["errors"][0]
+
+    resp = _call_mtm(token, b"Scrip,Qty\nTCS,1\n", "2024-01-01")
+    assert resp.status_code == 400
+    assert "Missing required column: price" in json.loads(resp.body)["validations"]["errors"]
@@ -0,0 +1,82 @@
+import json
+import os
+import subprocess
+import sys
+
+from starlette.requests import Request
+
+
+# Modules that must only be imported on first use, never at app startup
+HEAVY_MODULES = ["pandas", "numpy", "openpyxl"]
+
+
+def _run_python(code):
+    out = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=os.path.abspath(os.getcwd()),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def _get(path, headers=None):
+    raw = [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()]
+    return Request({"type": "http", "method": "GET", "path": path, "headers": raw})
+
+
+def test_startup_does_not_import_heavy_modules():
+    # Wall-clock budgets are too noisy to tell lazy from eager imports here;
+    # asserting on sys.modules is what actually guards cold start.
+    res = _run_python(
+        "import json, sys, time\n"
+        "t0 = time.perf_counter()\n"
+        "import app.main\n"
+        "elapsed = time.perf_counter() - t0\n"
+        f"heavy = [m for m in {HEAVY_MODULES!r} if m in sys.modules]\n"
+        "print(json.dumps({'elapsed': elapsed, 'heavy': heavy}))\n"
+    )
+    assert res["heavy"] == [], f"Heavy modules imported at startup ({res['elapsed']:.2f}s): {res['heavy']}"
+
+
+def test_sample_template_etag_stable_across_processes():
+    code = (
+        "import json\n"
+        "from app.main import _sample_template\n"
+        "print(json.dumps(_sample_template()[1]))\n"
+    )
+    assert _run_python(code) == _run_python(code)
+
+
+def test_sample_template_is_cached_with_etag():
+    from app.main import _etag_matches, _sample_template
+
+    data, etag = _sample_template()
+    assert data[:2] == b"PK"
+    assert _sample_template() == (data, etag)
+    assert _etag_matches(etag, etag)
+    assert _etag_matches(f'{etag[2:]}, "other"', etag)
+    assert _etag_matches("*", etag)
+    assert not _etag_matches('"other"', etag)
+    assert not _etag_matches("", etag)
+
+
+def test_sample_template_route_conditional_get():
+    from app.main import _sample_template, sample_template
+
+    data, etag = _sample_template()
+
+    resp = sample_template(_get("/sample/template.xlsx"))
+    assert resp.status_code == 200
+    assert resp.body == data
+    assert resp.headers["etag"] == etag
+    assert resp.headers["content-disposition"] == "attachment; filename=sample_template.xlsx"
+
+    resp = sample_template(_get("/sample/template.xlsx", {"If-None-Match": etag}))
+    assert resp.status_code == 304
+    assert resp.body == b""
+    assert resp.headers["etag"] == etag
+
+    resp = sample_template(_get("/sample/template.xlsx", {"If-None-Match": '"stale"'}))
+    assert resp.status_code == 200